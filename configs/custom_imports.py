@@ -1,7 +1,9 @@
 custom_imports = dict(
     imports=[
         'medfmc.datasets.medical_datasets',
+        'medfmc.datasets.transforms',
         'medfmc.evaluation.metrics.auc',
+        'medfmc.engine.hooks',
         'medfmc.models'
     ],
     allow_failed_imports=False)
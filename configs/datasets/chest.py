@@ -7,7 +7,8 @@ data_preprocessor = dict(
     std=[58.395, 57.12, 57.375],
     # convert image from BGR to RGB
     to_rgb=True,
-    to_onehot=True,
+    # Chest19 provides multi-hot gt_score targets, no one-hot conversion needed
+    to_onehot=False,
 )
 
 train_pipeline = [
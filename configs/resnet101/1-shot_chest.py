@@ -11,6 +11,8 @@ checkpoint = 'https://download.openmmlab.com/mmclassification/v0/resnet/resnet10
 lr = 1e-6
 train_bs = 32
 val_bs = 128
+num_workers = 8
+prefetch_factor = 4
 dataset = 'chest'
 model_name = 'resnet101'
 exp_num = 1
@@ -27,6 +29,8 @@ model = dict(
         num_stages=4,
         out_indices=(3,),
         style='pytorch',
+        # Freeze the stem, layer1 and layer2, only layer3 and layer4 are fine-tuned
+        frozen_stages=2,
         init_cfg=dict(type='Pretrained', checkpoint=checkpoint, prefix='backbone')
     ),
     neck=None,
@@ -39,17 +43,27 @@ model = dict(
         loss=dict(type='CrossEntropyLoss', use_sigmoid=True, loss_weight=1.0)))
 
 train_pipeline = [
-    dict(type='LoadImageFromFile'),
+    dict(type='LoadCachedImage'),
     dict(type='NumpyToPIL', to_rgb=True),
     dict(type='torchvision/RandomAffine', degrees=(-15, 15), translate=(0.05, 0.05), fill=128),
     dict(type='PILToNumpy', to_bgr=True),
-    dict(type='RandomResizedCrop', scale=448, crop_ratio_range=(0.9, 1.0), backend='pillow', interpolation='bicubic'),
-    dict(type='RandomFlip', prob=0.5, direction='horizontal'),
+    # RandomResizedCrop and RandomFlip run batched on the GPU in the data preprocessor
+    dict(type='Resize', scale=512, backend='pillow', interpolation='bicubic'),
     dict(type='PackInputs'),
 ]
 
+data_preprocessor = dict(
+    type='GPUAugClsDataPreprocessor',
+    crop_size=448,
+    crop_ratio_range=(0.9, 1.0),
+    interpolation='bicubic',
+    flip_prob=0.5,
+    # Training batches are cast and normalized in one pass straight to the AMP dtype
+    dtype='float16',
+)
+
 test_pipeline = [
-    dict(type='LoadImageFromFile'),
+    dict(type='LoadCachedImage'),
     dict(type='Resize', scale=448),
     dict(
         type='PackInputs',
@@ -59,27 +73,48 @@ test_pipeline = [
                    'gt_label_difficult')),
 ]
 
+# Decoded images are read from data/cache if present, create the caches with tools/cache_images.py
+# (train sets without --scale or with --encoded if too large to cache decoded, val and test sets with --scale 448)
 train_dataloader = dict(
     batch_size=train_bs,
-    dataset=dict(ann_file=f'data_anns/MedFMC/{dataset}/{dataset}_{nshot}-shot_train_exp{exp_num}.txt',
+    num_workers=num_workers,
+    prefetch_factor=prefetch_factor,
+    pin_memory_device='cuda',
+    dataset=dict(type='CachedChest19',
+                 cache_dir=f'data/cache/{dataset}/{dataset}_{nshot}-shot_train_exp{exp_num}',
+                 ann_file=f'data_anns/MedFMC/{dataset}/{dataset}_{nshot}-shot_train_exp{exp_num}.txt',
                  pipeline=train_pipeline)
 )
 
 val_dataloader = dict(
     batch_size=val_bs,
-    dataset=dict(ann_file=f'data_anns/MedFMC/{dataset}/{dataset}_{nshot}-shot_val_exp{exp_num}.txt',
+    num_workers=num_workers,
+    prefetch_factor=prefetch_factor,
+    pin_memory_device='cuda',
+    dataset=dict(type='CachedChest19',
+                 cache_dir=f'data/cache/{dataset}/{dataset}_{nshot}-shot_val_exp{exp_num}_448',
+                 ann_file=f'data_anns/MedFMC/{dataset}/{dataset}_{nshot}-shot_val_exp{exp_num}.txt',
                  pipeline=test_pipeline)
 )
 
 test_dataloader = dict(
-    batch_size=8,
-    dataset=dict(ann_file=f'data_anns/MedFMC/{dataset}/test_WithLabel.txt',
+    batch_size=val_bs,
+    num_workers=num_workers,
+    prefetch_factor=prefetch_factor,
+    pin_memory_device='cuda',
+    dataset=dict(type='CachedChest19',
+                 cache_dir=f'data/cache/{dataset}/test_WithLabel_448',
+                 ann_file=f'data_anns/MedFMC/{dataset}/test_WithLabel.txt',
                  pipeline=test_pipeline)
 )
 
-optimizer = dict(betas=(0.9, 0.999), eps=1e-08, lr=lr, type='AdamW', weight_decay=0.05)
+# bitsandbytes AdamW with block-wise 8-bit moments (registered by mmengine), a quarter of the fp32 optimizer state
+optimizer = dict(betas=(0.9, 0.999), eps=1e-08, lr=lr, type='AdamW8bit', weight_decay=0.05)
 
 optim_wrapper = dict(
+    type='AmpOptimWrapper',
+    dtype='float16',
+    loss_scale='dynamic',
     optimizer=optimizer,
     paramwise_cfg=dict(
         norm_decay_mult=0.0,
@@ -101,8 +136,25 @@ default_hooks = dict(
     logger=dict(interval=10),
 )
 
+custom_hooks = [dict(type='ChannelsLastHook'), dict(type='CUDAPrefetchHook')]
+
 visualizer = dict(type='Visualizer', vis_backends=[dict(type='TensorboardVisBackend')])
 
-train_cfg = dict(by_epoch=True, val_interval=25, max_epochs=500)
+# Compile the train_step with Inductor. GPUAugClsDataPreprocessor is excluded from compilation (its random crops are
+# data-dependent), so the compiled model only sees the fixed 448x448 crops. ChannelsLastHook converts the model
+# before the first traced step
+# 1-shot runs only have a single step per epoch, reduce-overhead skips the long kernel autotuning of max-autotune
+compile = dict(backend='inductor', mode='reduce-overhead', dynamic=False)
+
+# Input shapes are fixed to 448x448, so let cuDNN benchmark and cache the fastest conv algorithms
+# forkserver workers don't inherit a copy-on-write image of the training process, which keeps their RSS low
+env_cfg = dict(
+    cudnn_benchmark=True,
+    mp_cfg=dict(mp_start_method='forkserver', opencv_num_threads=0),
+    dist_cfg=dict(backend='nccl'),
+)
+
+# Validate sparsely early on and every 25 epochs in the last 100 epochs, where the best checkpoint is usually picked
+train_cfg = dict(by_epoch=True, val_interval=100, max_epochs=500, dynamic_intervals=[(400, 25)])
 
 randomness = dict(seed=0)
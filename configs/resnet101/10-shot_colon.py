@@ -40,10 +40,8 @@ model = dict(
 
 train_pipeline = [
     dict(type='LoadImageFromFile'),
-    dict(type='RandomResizedCrop', scale=448, crop_ratio_range=(0.7, 1.0)),
+    dict(type='RandomResizedCropFlip', scale=448, crop_ratio_range=(0.7, 1.0), hflip_prob=0.5, vflip_prob=0.5),
     #dict(type='ColorJitter', hue=0.3, brightness=0.4, contrast=0.4, saturation=0.4),
-    dict(type='RandomFlip', prob=0.5, direction='horizontal'),
-    dict(type='RandomFlip', prob=0.5, direction='vertical'),
     dict(type='PackInputs'),
 ]
 
@@ -9,7 +9,7 @@ from tqdm import tqdm
 
 from ensemble.submission import print_report_for_setting, extract_exp_number
 from ensemble.utils.constants import tasks, shots, exps
-from ensemble.utils.infer_missing_performances import get_file_from_directory, get_event_file_from_model_dir
+from ensemble.utils.scan import get_file_from_directory, get_event_file_from_model_dir
 
 
 def check_and_extract_data(model_dir_abs):
@@ -5,7 +5,7 @@ import sys
 from multiprocessing import Pool
 from termcolor import colored
 
-from ensemble.utils.infer_missing_performances import get_event_file_from_model_dir
+from ensemble.utils.scan import get_event_file_from_model_dir
 
 EXP_PATTERN = re.compile(r'exp(\d+)')
 
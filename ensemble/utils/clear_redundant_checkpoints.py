@@ -1,6 +1,5 @@
 import os
 import re
-import shutil
 import sys
 from multiprocessing import Pool
 from termcolor import colored
@@ -3,10 +3,8 @@ import os
 import re
 import shutil
 import sys
-from collections import defaultdict
 from multiprocessing import Pool
 
-from tensorboard.backend.event_processing.event_accumulator import EventAccumulator
 from termcolor import colored
 
 
@@ -1,6 +1,7 @@
 import os
 import shutil
 
+import pandas as pd
 from termcolor import colored
 
 
@@ -18,23 +19,23 @@ def is_valid_csv(path):
     return True
 
 
-def construct_model_paths(report):
-    lines = [line for line in report if any(t in line for t in TASKS)]
+def construct_model_paths(report_path):
+    # Entries are tab separated with the task/shot/exp first and the model name last, e.g.
+    # '| task/shot/exp', 'Aggregate: value', 'model name', the number of fields differs between reports
+    with open(report_path, 'r') as f:
+        report = pd.Series(f.read().splitlines(), dtype=str)
+    report = report[report.str.contains('|'.join(TASKS))].str.split('\t')
+    if report.empty:
+        return []
 
-    model_infos = []
-    for line in lines:
-        parts = line.split('\t')
+    # Extract task, shot, and exp number
+    task_shot_exp = report.str[0].str.split('/', expand=True)
+    model_tasks = task_shot_exp[0].str.strip('| ').str.strip()
+    model_shots = task_shot_exp[1].str.strip()
+    model_exps = task_shot_exp[2].str.strip()
+    model_names = report.str[-1].str.strip()
 
-        model_name = parts[-1].strip()
-        task_shot_exp = parts[0].split("/")
-
-        # Extract task, shot, and exp number
-        model_task = task_shot_exp[0].strip('| ').strip()
-        model_shot = task_shot_exp[1].strip()
-        model_exp = task_shot_exp[2].strip()
-
-        model_infos.append((model_name, model_task, model_shot, model_exp))
-    return model_infos
+    return list(zip(model_names, model_tasks, model_shots, model_exps))
 
 
 def get_prediction_dir():
@@ -56,33 +57,31 @@ SHOTS = ["1-shot", "5-shot", "10-shot"]
 # ================================================================================
 
 
-TIMESTAMP = get_prediction_dir()
-EVAL_REPORT_PATH = os.path.join(EVAL_BASE_PATH, TIMESTAMP, 'report.txt')
-
-try:
-    with open(EVAL_REPORT_PATH, 'r') as f:
-        report_content = f.readlines()
-except FileNotFoundError:
-    print(colored(f"No report.txt found in: {EVAL_REPORT_PATH}", 'red'))
-    exit()
+if __name__ == "__main__":
+    TIMESTAMP = get_prediction_dir()
+    EVAL_REPORT_PATH = os.path.join(EVAL_BASE_PATH, TIMESTAMP, 'report.txt')
 
-model_infos = construct_model_paths(report_content)
+    try:
+        model_infos = construct_model_paths(EVAL_REPORT_PATH)
+    except FileNotFoundError:
+        print(colored(f"No report.txt found in: {EVAL_REPORT_PATH}", 'red'))
+        exit()
 
-for path in model_infos:
-    print(path)
+    for path in model_infos:
+        print(path)
 
-for name, task, shot, exp in model_infos:
-    # Search for validation prediction csv and validate it
-    file_name = f"{task}_{shot}_validation.csv"
-    source_file_path = os.path.join(SCRATCH_BASE_PATH, 'work_dirs', task, shot, name, file_name)
+    for name, task, shot, exp in model_infos:
+        # Search for validation prediction csv and validate it
+        file_name = f"{task}_{shot}_validation.csv"
+        source_file_path = os.path.join(SCRATCH_BASE_PATH, 'work_dirs', task, shot, name, file_name)
 
-    if not is_valid_csv(source_file_path):
-        exit()
+        if not is_valid_csv(source_file_path):
+            exit()
 
-    # Construct target path and ensure that the directory exists
-    target_path = os.path.join(VAL_TARGET_PATH, TIMESTAMP, 'validation', 'result', exp)
-    os.makedirs(target_path, exist_ok=True)
+        # Construct target path and ensure that the directory exists
+        target_path = os.path.join(VAL_TARGET_PATH, TIMESTAMP, 'validation', 'result', exp)
+        os.makedirs(target_path, exist_ok=True)
 
-    target_file_path = os.path.join(target_path, file_name)
-    shutil.copy(source_file_path, target_file_path)
-    print(f"Copied from {source_file_path} to {target_file_path}")
+        target_file_path = os.path.join(target_path, file_name)
+        shutil.copy(source_file_path, target_file_path)
+        print(f"Copied from {source_file_path} to {target_file_path}")
@@ -1,22 +1,16 @@
 import argparse
 import itertools
 import json
-import multiprocessing
 import os
 import subprocess
 import sys
 from collections import Counter
-from functools import lru_cache
 from multiprocessing import Pool
 
 from termcolor import colored
 
 from ensemble.utils.constants import *
-
-
-def my_print(message):
-    sys.stdout.write(str(message) + '\n')
-    sys.stdout.flush()
+from ensemble.utils.scan import extract_exp_number, find_file, get_event_file_from_model_dir, get_file_from_directory, my_print, sort_report_entries
 
 
 def determine_gpu(gpu_type):
@@ -43,30 +37,6 @@ def determine_gpu(gpu_type):
     return gpu
 
 
-def get_file_from_directory(directory, extension=None, contains_string=None):
-    for file in os.listdir(directory):
-        if file.endswith(extension) and (not contains_string or contains_string in file):
-            return os.path.join(directory, file)
-    return None
-
-
-def get_event_file_from_model_dir(model_dir):
-    try:
-        for entry in os.listdir(model_dir):
-            full_path = os.path.join(model_dir, entry)
-            if os.path.isdir(full_path):
-                full_path = os.path.join(full_path, "vis_data")
-                event_file = os.listdir(full_path)[0]
-                return os.path.join(full_path, event_file)
-    except Exception:
-        return None
-
-
-def extract_exp_number(string):
-    match = EXP_PATTERN.search(string)
-    return int(match.group(1)) if match else 0
-
-
 def run_single_command(command, gpu, gpu_type, task_counter, num_commands):
     """
     Runs a single command on the specified GPU.
@@ -237,14 +207,13 @@ def print_report(model_infos):
         print(colored(f"\nAll valid models have an existing performance JSON!\n", 'green'))
         exit()
     else:
-        sorted_report_entries = sorted([model_dir for model_dir in model_dirs], key=sort_key)
+        sorted_report_entries = sort_report_entries(model_dirs)
         print(
             "\n---------------------------------------------------------------------------------------------------------------")
         print("| Valid Models without an existing performance JSON file:")
         print(
             "---------------------------------------------------------------------------------------------------------------")
-        for entry in sorted_report_entries:
-            print(f"| {entry}")
+        sys.stdout.write(''.join(f"| {entry}\n" for entry in sorted_report_entries))
         print(
             "---------------------------------------------------------------------------------------------------------------")
         print(f"| Found {len(model_dirs)} model runs without existing performance JSON.")
@@ -252,33 +221,11 @@ def print_report(model_infos):
             "---------------------------------------------------------------------------------------------------------------")
 
 
-def sort_key(entry):
-    # Extract task, shot, and experiment number from the entry
-    parts = entry.split('/')
-    task = parts[5]
-    shot = int(parts[6].split('-')[0])
-    exp_number = extract_exp_number(parts[-1])
-    return task, shot, exp_number
-
-
 def process_task_shot_combination(args):
     task, shot = args
     return task, shot, get_model_dirs_without_performance(task=task, shot=shot)
 
 
-@lru_cache(maxsize=None)
-def get_event_file_from_model_dir(model_dir):
-    try:
-        for entry in os.listdir(model_dir):
-            full_path = os.path.join(model_dir, entry)
-            if os.path.isdir(full_path):
-                full_path = os.path.join(full_path, "vis_data")
-                event_file = os.listdir(full_path)[0]
-                return os.path.join(full_path, event_file)
-    except Exception:
-        return None
-
-
 def get_model_dirs_without_performance(task, shot):
     """
     Retrieves a list of model directories without a performance file.
@@ -324,8 +271,9 @@ def generate_test_commands(model_infos):
     commands = []
     for model in model_infos.values():
         model_path = model['path']
-        config_filepath = get_file_from_directory(model_path, ".py")
-        checkpoint_filepath = get_file_from_directory(model_path, ".pth", "best")
+        entries = os.listdir(model_path)
+        config_filepath = find_file(entries, model_path, ".py")
+        checkpoint_filepath = find_file(entries, model_path, ".pth", "best")
         out_filepath = os.path.join(model_path, "performance.json")
 
         command = (f"python ensemble/create_performance_file_sample.py "
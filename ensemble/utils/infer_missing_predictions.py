@@ -12,18 +12,15 @@ Example:                        chest_10-shot_submission.csv
 import argparse
 import itertools
 import os
-import re
+import shlex
 import subprocess
 import sys
 from collections import Counter
-from multiprocessing import Pool
-from functools import lru_cache
-from tensorboard.backend.event_processing.event_accumulator import EventAccumulator
+from concurrent.futures import ThreadPoolExecutor
 from termcolor import colored
 
 from ensemble.utils.infer_missing_performances import determine_gpu
-
-EXP_PATTERN = re.compile(r'exp(\d+)')
+from ensemble.utils.scan import extract_exp_number, find_file, get_event_file_from_model_dir, my_print, sort_report_entries
 
 
 def run_commands_on_cluster(commands, num_commands, gpu_type='all'):
@@ -36,6 +33,7 @@ def run_commands_on_cluster(commands, num_commands, gpu_type='all'):
     gpu_cycle = itertools.cycle(gpus)
     task_counter = {'colon': 0, 'chest': 0, 'endo': 0}
 
+    slurm_cmds = []
     for command in commands:
         gpu = next(gpu_cycle)
 
@@ -57,25 +55,21 @@ def run_commands_on_cluster(commands, num_commands, gpu_type='all'):
             os.makedirs(log_dir)
 
         if gpu_type == 'a':
-            gpu_str = "--gres=gpu:1 --nodelist=gpu1a"
+            gpu_args = ["--gres=gpu:1", "--nodelist=gpu1a"]
         elif gpu_type == 'b':
-            gpu_str = "--gres=gpu:1 --nodelist=gpu1b"
+            gpu_args = ["--gres=gpu:1", "--nodelist=gpu1b"]
         else:
-            gpu_str = f"--gres=gpu:{gpu}:1"
+            gpu_args = [f"--gres=gpu:{gpu}:1"]
 
-        slurm_cmd = f'sbatch -p ls6 {gpu_str} --wrap="{command}" -o "{log_dir}/{log_file_name}.out"'
-        print(f"{slurm_cmd}\n")
+        slurm_cmd = ["sbatch", "-p", "ls6", *gpu_args, f"--wrap={command}", "-o", f"{log_dir}/{log_file_name}.out"]
+        print(f"{shlex.join(slurm_cmd)}\n")
 
         task_counter[task] += 1
-        subprocess.run(slurm_cmd, shell=True)
-
+        slurm_cmds.append(slurm_cmd)
 
-def get_file_from_directory(directory, extension, contains_string=None):
-    """Get a file from an absolute directory (i.e. from /scratch/..) with the given extension and optional substring."""
-    for file in os.listdir(directory):
-        if file.endswith(extension) and (not contains_string or contains_string in file):
-            return os.path.join(directory, file)
-    return None
+    # sbatch returns immediately, submit several jobs at once instead of waiting for each one
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(subprocess.run, slurm_cmds))
 
 
 def print_report(model_infos):
@@ -84,113 +78,77 @@ def print_report(model_infos):
         print(colored(f"\nAll valid models have an existing prediction CSV!\n", 'green'))
         exit()
     else:
-        sorted_report_entries = sorted([model_dir for model_dir in model_dirs], key=sort_key)
+        sorted_report_entries = sort_report_entries(model_dirs)
 
         print("\n---------------------------------------------------------------------------------------------------------------")
         print("| Valid Models without an existing prediction CSV file:")
         print("---------------------------------------------------------------------------------------------------------------")
-        for entry in sorted_report_entries:
-            print(f"| {entry.split('work_dirs/')[1]}")
+        sys.stdout.write(''.join(f"| {entry.split('work_dirs/')[1]}\n" for entry in sorted_report_entries))
         print("---------------------------------------------------------------------------------------------------------------")
         print(f"| Found {colored(str(len(model_dirs)) + ' model runs', 'blue')} without existing prediction CSV for {colored(csv_suffix_choice, 'blue')}.")
         print("---------------------------------------------------------------------------------------------------------------")
 
 
-def sort_key(entry):
-    # Extract task, shot, and experiment number from the entry
-    parts = entry.split('/')
-    task = parts[5]
-    shot = int(parts[6].split('-')[0])
-    exp_number = extract_exp_number(parts[-1])
-    return task, shot, exp_number
-
-
-def my_print(message):
-    sys.stdout.write(message + '\n')
-    sys.stdout.flush()
-
+def contains_csv_file(task, shot, file_names):
+    return f"{task}_{shot}-shot_{csv_suffix_choice}.csv" in file_names
 
-def process_task_shot_combination(args):
-    task, shot = args
-    return task, shot, get_model_dirs_without_prediction(task=task, shot=shot)
 
+def check_model_dir(task, shot, abs_model_dir):
+    """Returns the reason for skipping the given model dir, or None if it is missing its prediction CSV."""
+    # Skip if missing write access
+    if not os.access(abs_model_dir, os.W_OK):
+        return colored('Skipping: Missing Write Access', 'red')
 
-def extract_exp_number(string):
-    match = EXP_PATTERN.search(string)
-    return int(match.group(1)) if match else 0
+    # List the model dir once and run all checks against that snapshot
+    with os.scandir(abs_model_dir) as it:
+        entries = list(it)
+    file_names = {entry.name for entry in entries}
 
+    # Skip if no best checkpoint file
+    checkpoint_path = find_file(file_names, abs_model_dir, ".pth", "best")
+    if checkpoint_path is None:
+        return colored('Skipping: No best checkpoint file found', 'magenta')
 
-def contains_csv_file(task, shot, model_dir):
-    expected_filename = f"{task}_{shot}-shot_{csv_suffix_choice}.csv"
-
-    try:
-        return os.path.exists(os.path.join(model_dir, expected_filename))
-    except FileNotFoundError:
-        pass
-    except PermissionError as permission_error:
-        my_print(f"Permission Error encountered: {permission_error}")
-        return False
-
-    return False
+    # Skip/Delete if no event file
+    event_file = get_event_file_from_model_dir(abs_model_dir, entries)
+    if event_file is None:
+        return colored('Skipping: No event file found', 'yellow')
 
+    # Skip if prediction csv file is present
+    if contains_csv_file(task, shot, file_names):
+        return colored(f'Skipping: Model already contains {csv_suffix_choice} CSV', 'blue')
 
-@lru_cache(maxsize=None)
-def is_metric_in_event_file(file_path, metric):
-    event_acc = EventAccumulator(file_path, size_guidance={'scalars': 0})  # 0 means load none, just check tags
-    event_acc.Reload()
-    scalar_tags = event_acc.Tags()['scalars']
-    return metric in scalar_tags
-
-
-@lru_cache(maxsize=None)
-def get_event_file_from_model_dir(model_dir):
-    try:
-        for entry in os.listdir(model_dir):
-            full_path = os.path.join(model_dir, entry)
-            if os.path.isdir(full_path):
-                full_path = os.path.join(full_path, "vis_data")
-                event_file = os.listdir(full_path)[0]
-                return os.path.join(full_path, event_file)
-    except Exception:
-        return None
+    return None
 
 
-def get_model_dirs_without_prediction(task, shot):
-    model_dirs = []
+def get_setting_model_dirs(task, shot):
     setting_directory = os.path.join(work_dir_path, task, f"{shot}-shot")
-
     try:
-        setting_model_dirs = os.listdir(setting_directory)
-    except Exception:
-        return None
+        with os.scandir(setting_directory) as it:
+            return [os.path.join(setting_directory, entry.name) for entry in it if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
 
-    for model_dir in setting_model_dirs:
-        my_print(f"Checking {task}/{shot}-shot/{model_dir}")
-        abs_model_dir = os.path.join(setting_directory, model_dir)
 
-        # Skip if missing write access
-        if not os.access(abs_model_dir, os.W_OK):
-            print(f"{colored('Skipping: Missing Write Access', 'red')}")
-            continue
-
-        # Skip if no best checkpoint file
-        checkpoint_path = get_file_from_directory(abs_model_dir, ".pth", "best")
-        if checkpoint_path is None:
-            print(f"{colored(f'Skipping: No best checkpoint file found', 'magenta')}")
-            continue
+def get_model_dirs_without_prediction(combinations):
+    """Returns (task, shot, model_dir) of all model dirs of the given (task, shot) combinations without prediction."""
+    candidates = [(task, shot, abs_model_dir)
+                  for task, shot in combinations
+                  for abs_model_dir in get_setting_model_dirs(task, shot)]
 
-        # Skip/Delete if no event file
-        event_file = get_event_file_from_model_dir(abs_model_dir)
-        if event_file is None:
-            print(f"{colored(f'Skipping: No event file found', 'yellow')}")
-            continue
+    # The checks are pure filesystem I/O, fan them out over one bounded pool and report in the original order
+    model_dirs = []
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        skip_reasons = executor.map(lambda candidate: check_model_dir(*candidate), candidates)
 
-        # Skip if prediction csv file is present
-        if contains_csv_file(task, shot, abs_model_dir):
-            print(f"{colored(f'Skipping: Model already contains {csv_suffix_choice} CSV', 'blue')}")
-            continue
+        for (task, shot, abs_model_dir), skip_reason in zip(candidates, skip_reasons):
+            model_dir = os.path.basename(abs_model_dir)
+            my_print(f"Checking {task}/{shot}-shot/{model_dir}")
+            if skip_reason is not None:
+                print(skip_reason)
+                continue
 
-        model_dirs.append(model_dir)
+            model_dirs.append((task, shot, model_dir))
     return model_dirs
 
 
@@ -233,7 +191,7 @@ csv_suffix_2_img_suffix = dict(zip(csv_suffix_list, img_suffix_list))
 # ========================================================================================
 
 
-if __name__ == "__main__":  # Important when using multiprocessing
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Infers missing predictions from model runs on the test set.')
     parser.add_argument("--gpu", type=str, default='all',
                         help="GPU type: \n- 'c'=rtx4090,\n- '8a'=rtx2070ti\n"
@@ -251,26 +209,18 @@ if __name__ == "__main__":  # Important when using multiprocessing
     csv_suffix_choice = get_csv_suffix_choice()
     print(f"\nSelected CSV suffix: {colored(csv_suffix_choice, 'blue')}\n")
 
-    with Pool() as pool:
-        combinations = [(task, shot) for task in tasks for shot in shots]
-
-        # Use imap_unordered and directly iterate over the results
-        results = []
-        for result in pool.imap_unordered(process_task_shot_combination, combinations):
-            results.append(result)
-
+    combinations = [(task, shot) for task in tasks for shot in shots]
     model_infos = {}
-    for task, shot, model_list in results:
-        for model_name in model_list:
-            model_path = os.path.join(work_dir_path, task, f"{shot}-shot", model_name)
-            exp_num = extract_exp_number(model_name)
-            model_infos[model_name] = {
-                "task": task,
-                "shot": shot,
-                "exp_num": exp_num,
-                "name": model_name,
-                "path": model_path,
-            }
+    for task, shot, model_name in get_model_dirs_without_prediction(combinations):
+        model_path = os.path.join(work_dir_path, task, f"{shot}-shot", model_name)
+        exp_num = extract_exp_number(model_name)
+        model_infos[model_name] = {
+            "task": task,
+            "shot": shot,
+            "exp_num": exp_num,
+            "name": model_name,
+            "path": model_path,
+        }
 
     print_report(model_infos)
 
@@ -286,11 +236,13 @@ if __name__ == "__main__":  # Important when using multiprocessing
         model_path = model['path']
         model_name = model['name']
 
+        entries = os.listdir(model_path)
+
         # Config Path
-        config_filepath = get_file_from_directory(model_path, ".py")
+        config_filepath = find_file(entries, model_path, ".py")
 
         # Checkpoint Path
-        checkpoint_filepath = get_file_from_directory(model_path, ".pth", "best")
+        checkpoint_filepath = find_file(entries, model_path, ".pth", "best")
 
         # Image Path
         data_suffix = csv_suffix_2_img_suffix.get(csv_suffix_choice, None)
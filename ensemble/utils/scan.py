@@ -0,0 +1,74 @@
+import itertools
+import os
+import sys
+from functools import lru_cache
+
+from ensemble.utils.constants import EXP_PATTERN
+
+_search_exp = EXP_PATTERN.search
+
+
+MY_PRINT_FLUSH_INTERVAL = 50
+_my_print_count = itertools.count(1)
+
+
+def my_print(message):
+    # Status lines are flushed in batches, the prompts of the scripts flush any remainder
+    sys.stdout.write(str(message) + '\n')
+    if next(_my_print_count) % MY_PRINT_FLUSH_INTERVAL == 0:
+        sys.stdout.flush()
+
+
+def find_file(entries, directory, extension, contains_string=None):
+    """Get a file from a pre-computed listing of the given directory with the given extension and optional substring."""
+    for file in entries:
+        if file.endswith(extension) and (not contains_string or contains_string in file):
+            return os.path.join(directory, file)
+    return None
+
+
+def get_file_from_directory(directory, extension, contains_string=None):
+    """Get a file from an absolute directory (i.e. from /scratch/..) with the given extension and optional substring."""
+    return find_file(os.listdir(directory), directory, extension, contains_string)
+
+
+def get_event_file_from_model_dir(model_dir, entries=None):
+    if entries is None:
+        try:
+            with os.scandir(model_dir) as it:
+                entries = list(it)
+        except OSError:
+            return None
+
+    # Only the timestamped run dirs carry a vis_data dir, skip any other subdir without raising on it
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            with os.scandir(os.path.join(entry.path, "vis_data")) as it:
+                return next(it).path
+        except (OSError, StopIteration):
+            continue
+    return None
+
+
+@lru_cache(maxsize=65536)
+def extract_exp_number(string):
+    match = _search_exp(string)
+    return int(match.group(1)) if match else 0
+
+
+def sort_key(entry):
+    # Extract task, shot, and experiment number from the entry
+    parts = entry.split('/')
+    task = parts[5]
+    shot = int(parts[6].split('-')[0])
+    exp_number = extract_exp_number(parts[-1])
+    return task, shot, exp_number
+
+
+def sort_report_entries(entries):
+    """Sorts model dir paths by task, shot and exp number, ties are broken by the path itself."""
+    decorated = [(sort_key(entry), entry) for entry in entries]
+    decorated.sort()
+    return [entry for _, entry in decorated]
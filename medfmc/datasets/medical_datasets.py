@@ -1,8 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 
+import logging
+import os
+
 import numpy as np
 from mmpretrain.datasets import CustomDataset
 from mmengine.fileio import join_path
+from mmengine.logging import print_log
 
 from mmpretrain.registry import DATASETS
 
@@ -28,14 +32,14 @@ class Chest19(CustomDataset):
             samples = [x.strip() for x in f.readlines()]
             for item in samples:
                 filename, imglabel = item.split(' ')
-                gt_label = np.asarray(
-                    list(map(int, imglabel.split(','))), dtype=np.int8)
+                # Keep the multi-hot vector as gt_score, so no one-hot labels have to be built per batch
+                gt_score = np.asarray(
+                    list(map(int, imglabel.split(','))), dtype=np.float32)
 
-                gt_label = np.where(gt_label == 1)[0].tolist()
                 img_path = join_path(self.img_prefix, filename)
                 info = {
                     'img_path': img_path, 
-                    'gt_label': gt_label
+                    'gt_score': gt_score
                 }
 
                 data_list.append(info)
@@ -43,6 +47,43 @@ class Chest19(CustomDataset):
         return data_list
 
 
+@DATASETS.register_module()
+class CachedChest19(Chest19):
+    """Chest19 with decoded images read from a cache written by ``tools/cache_images.py``.
+
+    Use together with the ``LoadCachedImage`` transform. If ``cache_dir`` holds no matching cache, the images are
+    decoded from disk as usual.
+    """
+
+    def __init__(self, cache_dir, **kwargs):
+        self.cache_dir = cache_dir
+        super(CachedChest19, self).__init__(**kwargs)
+
+    def load_data_list(self):
+        data_list = super(CachedChest19, self).load_data_list()
+
+        index_file = os.path.join(self.cache_dir, 'index.npz')
+        if not os.path.isfile(index_file):
+            print_log(f'No image cache in {self.cache_dir}, decoding images from disk', logger='current', level=logging.WARNING)
+            return data_list
+
+        index = np.load(index_file)
+        if index['filenames'].tolist() != [os.path.basename(info['img_path']) for info in data_list]:
+            print_log(f'Image cache in {self.cache_dir} does not match {self.ann_file}, decoding images from disk',
+                      logger='current', level=logging.WARNING)
+            return data_list
+
+        cache_file = os.path.join(self.cache_dir, 'images.bin')
+        for info, offset, length in zip(data_list, index['offsets'].tolist(), index['lengths'].tolist()):
+            info.update(cache_file=cache_file, cache_offset=offset, cache_length=length)
+        # Caches written with --encoded hold the image files, which LoadCachedImage decodes like LoadImageFromFile
+        if not index['encoded']:
+            for info, shape in zip(data_list, index['shapes'].tolist()):
+                info['cache_shape'] = tuple(shape)
+
+        return data_list
+
+
 @DATASETS.register_module()
 class Endoscopy(CustomDataset):
 
@@ -0,0 +1,100 @@
+from functools import lru_cache
+
+import mmcv
+import numpy as np
+from mmcv.transforms import LoadImageFromFile
+from mmcv.transforms.utils import cache_randomness
+from mmpretrain.datasets.transforms import RandomResizedCrop
+from mmpretrain.registry import TRANSFORMS
+
+
+@lru_cache(maxsize=None)
+def _open_cache(cache_file):
+    # Opened lazily, so every dataloader worker maps the blob on its own
+    return np.memmap(cache_file, dtype=np.uint8, mode='r')
+
+
+@TRANSFORMS.register_module()
+class LoadCachedImage(LoadImageFromFile):
+    """Load an image from the image cache written by ``tools/cache_images.py``.
+
+    Expects the ``cache_file``, ``cache_offset`` and ``cache_length`` keys set by ``CachedChest19``, plus
+    ``cache_shape`` for caches of decoded images. Packed image files (``--encoded``) are decoded from the cache and
+    samples without a cache entry from ``img_path``, both like in ``LoadImageFromFile``.
+    """
+
+    def transform(self, results):
+        cache_file = results.get('cache_file')
+        if cache_file is None:
+            return super().transform(results)
+
+        offset = results['cache_offset']
+        content = _open_cache(cache_file)[offset:offset + results['cache_length']]
+        if 'cache_shape' in results:
+            # Copy out of the read-only mapping, the following transforms may work in place
+            img = np.array(content.reshape(*results['cache_shape'], 3))
+        else:
+            img = mmcv.imfrombytes(content.tobytes(), flag=self.color_type, backend=self.imdecode_backend)
+        if self.to_float32:
+            img = img.astype(np.float32)
+
+        results['img'] = img
+        results['img_shape'] = img.shape[:2]
+        results['ori_shape'] = img.shape[:2]
+        return results
+
+
+@TRANSFORMS.register_module()
+class RandomResizedCropFlip(RandomResizedCrop):
+    """RandomResizedCrop and random horizontal / vertical flips in a single transform.
+
+    Replaces ``RandomResizedCrop`` followed by ``RandomFlip(direction='horizontal')`` and
+    ``RandomFlip(direction='vertical')``. The crop is resized straight from a view into the image instead of a cropped
+    copy, and both flips are applied as one strided view, so the resize is the only pass writing the image.
+
+    Args:
+        hflip_prob (float): Probability of a horizontal flip.
+        vflip_prob (float): Probability of a vertical flip.
+        **kwargs: Arguments of RandomResizedCrop.
+    """
+
+    def __init__(self, hflip_prob=0.5, vflip_prob=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.hflip_prob = hflip_prob
+        self.vflip_prob = vflip_prob
+
+    @cache_randomness
+    def rand_flip_direction(self):
+        hflip = np.random.rand() < self.hflip_prob
+        vflip = np.random.rand() < self.vflip_prob
+        if hflip and vflip:
+            return 'diagonal'
+        if hflip:
+            return 'horizontal'
+        if vflip:
+            return 'vertical'
+        return None
+
+    def transform(self, results):
+        img = results['img']
+        offset_h, offset_w, target_h, target_w = self.rand_crop_params(img)
+        img = mmcv.imresize(
+            img[offset_h:offset_h + target_h, offset_w:offset_w + target_w],
+            tuple(self.scale[::-1]),
+            interpolation=self.interpolation,
+            backend=self.backend)
+
+        direction = self.rand_flip_direction()
+        if direction is not None:
+            img = mmcv.imflip(img, direction=direction)
+
+        results['img'] = img
+        results['img_shape'] = img.shape
+        results['flip'] = direction is not None
+        results['flip_direction'] = direction
+        return results
+
+    def __repr__(self):
+        repr_str = super().__repr__()[:-1]
+        repr_str += f', hflip_prob={self.hflip_prob}, vflip_prob={self.vflip_prob})'
+        return repr_str
@@ -0,0 +1,95 @@
+import torch
+from mmengine.hooks import Hook
+from mmengine.model import is_model_wrapper
+from mmpretrain.registry import HOOKS
+
+
+def _to_channels_last(module, args):
+    return tuple(
+        arg.contiguous(memory_format=torch.channels_last)
+        if isinstance(arg, torch.Tensor) and arg.dim() == 4 else arg
+        for arg in args)
+
+
+@HOOKS.register_module()
+class ChannelsLastHook(Hook):
+    """Run the model in the channels_last (NHWC) memory format.
+
+    Converts all 4D parameters of the model once before the run and registers
+    a forward pre-hook on the backbone, which converts the normalized input
+    batch coming out of the data preprocessor. With both weights and inputs
+    in NHWC, cuDNN can skip its internal layout transposes for conv, BN and
+    pooling layers.
+    """
+
+    priority = 'VERY_HIGH'
+
+    def before_run(self, runner) -> None:
+        model = runner.model
+        if is_model_wrapper(model):
+            model = model.module
+
+        model.to(memory_format=torch.channels_last)
+        model.backbone.register_forward_pre_hook(_to_channels_last)
+
+
+class _CUDAPrefetcher:
+    """Wraps a dataloader and copies the inputs of the next batch to the GPU on a side stream while the current
+    batch is processed. All other attributes are forwarded to the wrapped dataloader."""
+
+    def __init__(self, dataloader, device):
+        self.dataloader = dataloader
+        self.device = device
+        self.stream = torch.cuda.Stream(device)
+
+    def __len__(self):
+        return len(self.dataloader)
+
+    def __getattr__(self, name):
+        return getattr(self.dataloader, name)
+
+    def _preload(self, data_batch):
+        with torch.cuda.stream(self.stream):
+            inputs = data_batch['inputs']
+            if isinstance(inputs, torch.Tensor):
+                data_batch['inputs'] = inputs.to(self.device, non_blocking=True)
+            else:
+                data_batch['inputs'] = [input_.to(self.device, non_blocking=True) for input_ in inputs]
+        return data_batch
+
+    def _wait(self, data_batch):
+        current_stream = torch.cuda.current_stream(self.device)
+        current_stream.wait_stream(self.stream)
+        inputs = data_batch['inputs']
+        # Tensors copied on the side stream are used on the current stream, keep the allocator from reusing them early
+        for input_ in ([inputs] if isinstance(inputs, torch.Tensor) else inputs):
+            input_.record_stream(current_stream)
+        return data_batch
+
+    def __iter__(self):
+        iterator = iter(self.dataloader)
+        try:
+            next_batch = self._preload(next(iterator))
+        except StopIteration:
+            return
+
+        for data_batch in iterator:
+            batch = self._wait(next_batch)
+            next_batch = self._preload(data_batch)
+            yield batch
+        yield self._wait(next_batch)
+
+
+@HOOKS.register_module()
+class CUDAPrefetchHook(Hook):
+    """Copy the inputs of the next training batch to the GPU while the current batch is processed.
+
+    Wraps the dataloader of the train loop in a prefetcher, which issues the non-blocking host to device copies on a
+    dedicated CUDA stream. The data preprocessor then finds the inputs already on the GPU. Needs ``pin_memory=True``.
+    """
+
+    def before_train(self, runner) -> None:
+        if not torch.cuda.is_available():
+            return
+        device = torch.device('cuda', torch.cuda.current_device())
+        runner.train_loop.dataloader = _CUDAPrefetcher(runner.train_loop.dataloader, device)
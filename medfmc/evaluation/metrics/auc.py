@@ -1,4 +1,3 @@
-import math
 from typing import List, Optional, Sequence
 
 import numpy as np
@@ -6,87 +5,86 @@ import torch
 from mmengine.evaluator import BaseMetric
 from mmpretrain.registry import METRICS
 from mmpretrain.structures import label_to_onehot
-from sklearn import metrics
-from sklearn.metrics import average_precision_score
+from scipy.stats import rankdata
 
 
 def compute_auc(cls_scores, cls_labels):
+    """Per-class ROC AUC, computed for all classes at once from the (tie averaged) ranks of the scores.
+
+    Equals ``metrics.roc_auc_score`` per class. Like before, a class without positive or negative samples repeats the
+    AUC of the previous class.
+    """
+    cls_scores = np.asarray(cls_scores, dtype=np.float64)
+    cls_labels = np.asarray(cls_labels)
+
+    positive = cls_labels == 1
+    n_pos = positive.sum(axis=0)
+    n_neg = cls_labels.shape[0] - n_pos
+    valid = ((cls_labels == 0) | positive).all(axis=0) & (n_pos > 0) & (n_neg > 0)
+
+    # Mann-Whitney U statistic of the positive samples, normalized to [0, 1]
+    ranks = rankdata(cls_scores, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        aucs = ((ranks * positive).sum(axis=0) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
     cls_aucs = []
     for i in range(cls_scores.shape[1]):
-        scores_per_class = cls_scores[:, i]
-        labels_per_class = cls_labels[:, i]
-        try:
-            auc_per_class = metrics.roc_auc_score(labels_per_class,
-                                                  scores_per_class)
-            # print('class {} auc = {:.2f}'.format(i + 1, auc_per_class * 100))
-        except ValueError:
-            pass
+        if valid[i]:
+            auc_per_class = aucs[i]
         cls_aucs.append(auc_per_class * 100)
 
     return cls_aucs
 
 
-def cal_auc_per_class(target, cosine_scores):
-    '''Calculate AUC per class.'''
-    sample_num = target.shape[0]
-    cls_num = cosine_scores.shape[1]
+def compute_average_precision(cls_scores, cls_labels):
+    """Per-class average precision for all classes at once, equals ``average_precision_score(average=None)``.
 
-    gt_labels = np.zeros((sample_num, cls_num))
-    for k in range(target.shape[0]):
-        label = target[k]
-        gt_labels[k, :] = label
+    The scores of every class are sorted in descending order, tied scores form one threshold. Each positive sample
+    contributes the precision at the end of its tie group, divided by the number of positives of the class.
+    """
+    cls_scores = np.asarray(cls_scores, dtype=np.float64)
+    cls_labels = np.asarray(cls_labels)
 
-    cls_scores = np.zeros((sample_num, cls_num))
-    for k in range(target.shape[0]):
-        cos_score = cosine_scores[k]
-        norm_scores = [1 / (1 + math.exp(-1 * v)) for v in cos_score]
-        cls_scores[k, :] = np.array(norm_scores)
+    order = np.argsort(-cls_scores, axis=0, kind='mergesort')
+    scores = np.take_along_axis(cls_scores, order, axis=0)
+    positive = np.take_along_axis(cls_labels == 1, order, axis=0)
 
-    cls_aucs = compute_auc(cls_scores, gt_labels)
-    return cls_aucs
+    num_samples = len(scores)
+    precision = np.cumsum(positive, axis=0) / np.arange(1, num_samples + 1)[:, None]
 
+    # Index of the last sample of every tie group, spread back over the whole group
+    is_group_end = np.ones_like(scores, dtype=bool)
+    is_group_end[:-1] = scores[1:] != scores[:-1]
+    group_end = np.where(is_group_end, np.arange(num_samples)[:, None], num_samples)
+    group_end = np.minimum.accumulate(group_end[::-1], axis=0)[::-1]
 
-def cal_metrics_multilabel(target, cosine_scores):
-    """Calculate mean AUC with given dataset information and cosine scores."""
+    precision_at_group_end = np.take_along_axis(precision, group_end, axis=0)
+    n_pos = positive.sum(axis=0)
+    # Classes without positives get an AP of 0, like in sklearn
+    return (positive * precision_at_group_end).sum(axis=0) / np.maximum(n_pos, 1)
 
-    sample_num = target.shape[0]
-    cls_num = cosine_scores.shape[1]
 
-    gt_labels = np.zeros((sample_num, cls_num))
-    for k in range(target.shape[0]):
-        label = target[k]
-        gt_labels[k, :] = label
+def sigmoid_scores(cosine_scores):
+    return 1 / (1 + np.exp(-np.asarray(cosine_scores, dtype=np.float64)))
 
-    cls_scores = np.zeros((sample_num, cls_num))
-    for k in range(target.shape[0]):
-        cos_score = cosine_scores[k]
-        norm_scores = [1 / (1 + math.exp(-1 * v)) for v in cos_score]
-        cls_scores[k, :] = np.array(norm_scores)
 
-    cls_aucs = compute_auc(cls_scores, gt_labels)
-    mean_auc = np.mean(cls_aucs)
+def cal_auc_per_class(target, cosine_scores):
+    '''Calculate AUC per class.'''
+    return compute_auc(sigmoid_scores(cosine_scores), np.asarray(target, dtype=np.float64))
 
-    return mean_auc
+
+def cal_metrics_multilabel(target, cosine_scores):
+    """Calculate mean AUC with given dataset information and cosine scores."""
+    return np.mean(cal_auc_per_class(target, cosine_scores))
 
 
 def cal_metrics_multiclass(target, cosine_scores):
-    sample_num = target.shape[0]
     cls_num = cosine_scores.shape[1]
 
-    gt_labels = np.zeros((sample_num, cls_num))
-    for k in range(target.shape[0]):
-        label = target[k]
-        one_hot_label = np.array([int(i == label) for i in range(cls_num)])
-        gt_labels[k, :] = one_hot_label
-
-    cls_scores = np.zeros((sample_num, cls_num))
-    for k in range(target.shape[0]):
-        cos_score = cosine_scores[k]
+    gt_labels = (np.asarray(target).reshape(-1, 1) == np.arange(cls_num)).astype(np.float64)
 
-        norm_scores = [math.exp(v) for v in cos_score]
-        norm_scores /= np.sum(norm_scores)
-
-        cls_scores[k, :] = np.array(norm_scores)
+    cls_scores = np.exp(np.asarray(cosine_scores, dtype=np.float64))
+    cls_scores /= cls_scores.sum(axis=1, keepdims=True)
 
     cls_aucs = compute_auc(cls_scores, gt_labels)
     mean_auc = np.mean(cls_aucs)
@@ -157,10 +155,8 @@ class AUC(BaseMetric):
         target = torch.stack([res['gt_score'] for res in results])
         pred = torch.stack([res['pred_score'] for res in results])
 
-        if self.multilabel:
-            res = cal_metrics_multilabel(target, pred)
-        else:
-            res = cal_metrics_multilabel(target, pred)
+        aucs_per_class = cal_auc_per_class(target, pred)
+        res = np.mean(aucs_per_class)
 
         result_metrics = dict()
         if self.multilabel:
@@ -168,7 +164,6 @@ class AUC(BaseMetric):
         else:
             result_metrics['AUC_multiclass'] = float(res)
 
-        aucs_per_class = cal_auc_per_class(target, pred)
         for i in range(len(aucs_per_class)):
             result_metrics[f'AUC_class{i + 1}'] = aucs_per_class[i]
         return result_metrics
@@ -279,8 +274,8 @@ class Aggregate(BaseMetric):
         pred = torch.stack([res['pred_score'] for res in results])
 
         auc = cal_metrics_multilabel(target, pred)
-        map = average_precision_score(target.numpy(), pred.numpy()) * 100
-        map_per_class = average_precision_score(target.numpy(), pred.numpy(), average=None)
+        map_per_class = compute_average_precision(pred.numpy(), target.numpy())
+        map = np.mean(map_per_class) * 100
 
         result_metrics = dict()
         for i in range(len(map_per_class)):
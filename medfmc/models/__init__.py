@@ -4,6 +4,7 @@ from .prompt_vit import PromptedViT
 from .prompt_eva import PromptedViTEVA02
 from .prompt_swinv2 import PromptedSwinTransformerV2
 from .prompt_swin_semifreeze import SemiFreezePromptedSwinTransformer
+from .data_preprocessor import FusedClsDataPreprocessor, GPUAugClsDataPreprocessor
 
 __all__ = [
     'PromptedViT', 
@@ -11,5 +12,7 @@ __all__ = [
     "SemiFreezePromptedSwinTransformer",
     'CustomPromptedSwinTransformer',
     'PromptedViTEVA02',
-    'PromptedSwinTransformerV2'
+    'PromptedSwinTransformerV2',
+    'FusedClsDataPreprocessor',
+    'GPUAugClsDataPreprocessor'
 ]
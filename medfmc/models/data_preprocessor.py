@@ -0,0 +1,138 @@
+import torch
+import torch.nn as nn
+from mmpretrain.models import ClsDataPreprocessor
+from mmpretrain.registry import MODELS
+from mmpretrain.structures import (DataSample, MultiTaskDataSample,
+                                   batch_label_to_onehot, cat_batch_labels,
+                                   tensor_split)
+
+# torch.compiler only exists since torch 2.1, older torch versions have nothing to exclude from compilation
+_compiler_disable = getattr(getattr(torch, 'compiler', None), 'disable', lambda fn: fn)
+
+
+@MODELS.register_module()
+class FusedClsDataPreprocessor(ClsDataPreprocessor):
+    """ClsDataPreprocessor which normalizes the whole uint8 batch at once and emits it in the given dtype.
+
+    The uint8 images are copied to the GPU (non-blocking from pinned memory) and stacked, then cast and normalized
+    with one ``addcmul`` of the pre-computed ``1 / std`` and ``-mean / std`` instead of a subtract and a divide. During
+    training the batch is emitted in ``dtype`` (e.g. float16 to match an AmpOptimWrapper), validation and test batches
+    stay float32 since the val/test loops run without autocast. Batches that need padding fall back to
+    ClsDataPreprocessor.
+
+    Args:
+        dtype (str): Dtype of the normalized training batch.
+    """
+
+    def __init__(self, dtype='float16', **kwargs):
+        super().__init__(**kwargs)
+        self._non_blocking = True
+        self.dtype = getattr(torch, dtype)
+
+        if self._enable_normalize:
+            self.register_buffer('scale', 1 / self.std, False)
+            self.register_buffer('bias', -self.mean / self.std, False)
+
+    def forward(self, data, training=False):
+        inputs = data['inputs']
+        if isinstance(inputs, torch.Tensor):
+            shapes = {inputs.shape[1:]}
+        else:
+            shapes = {input_.shape for input_ in inputs}
+        if self.pad_size_divisor > 1 or len(shapes) > 1:
+            return super().forward(data, training)
+
+        inputs = self.cast_data(inputs)
+        if not isinstance(inputs, torch.Tensor):
+            inputs = torch.stack(inputs)
+
+        # ------ To RGB ------
+        if self.to_rgb and inputs.size(1) == 3:
+            inputs = inputs.flip(1)
+
+        # -- Normalization ---
+        dtype = self.dtype if training else torch.float32
+        inputs = inputs.to(dtype)
+        if self._enable_normalize:
+            inputs = torch.addcmul(self.bias.to(dtype), inputs, self.scale.to(dtype))
+
+        data_samples = data.get('data_samples', None)
+        inputs, data_samples = self.process_labels(inputs, data_samples, training)
+        return {'inputs': inputs, 'data_samples': data_samples}
+
+    def process_labels(self, inputs, data_samples, training=False):
+        """Batches the labels / scores of the data samples and applies the batch augments, as in ClsDataPreprocessor."""
+        sample_item = data_samples[0] if data_samples is not None else None
+
+        if isinstance(sample_item, DataSample):
+            batch_label = None
+            batch_score = None
+
+            if 'gt_label' in sample_item:
+                gt_labels = [sample.gt_label for sample in data_samples]
+                batch_label, label_indices = cat_batch_labels(gt_labels)
+                batch_label = batch_label.to(self.device)
+            if 'gt_score' in sample_item:
+                gt_scores = [sample.gt_score for sample in data_samples]
+                batch_score = torch.stack(gt_scores).to(self.device)
+            elif self.to_onehot and 'gt_label' in sample_item:
+                num_classes = self.num_classes or sample_item.get('num_classes')
+                assert num_classes is not None, \
+                    'Cannot generate one-hot format labels because not set `num_classes` in `data_preprocessor`.'
+                batch_score = batch_label_to_onehot(batch_label, label_indices, num_classes).to(self.device)
+
+            if training and self.batch_augments is not None and batch_score is not None:
+                inputs, batch_score = self.batch_augments(inputs, batch_score)
+
+            if batch_label is not None:
+                for sample, label in zip(data_samples, tensor_split(batch_label, label_indices)):
+                    sample.set_gt_label(label)
+            if batch_score is not None:
+                for sample, score in zip(data_samples, batch_score):
+                    sample.set_gt_score(score)
+        elif isinstance(sample_item, MultiTaskDataSample):
+            data_samples = self.cast_data(data_samples)
+
+        return inputs, data_samples
+
+
+@MODELS.register_module()
+class GPUAugClsDataPreprocessor(FusedClsDataPreprocessor):
+    """FusedClsDataPreprocessor which applies RandomResizedCrop and horizontal flips to the whole batch on the GPU.
+
+    The train pipeline only has to resize the images to a common size (e.g. ``Resize(scale=512)``), the random crop
+    and flip run on the normalized batch via kornia. Validation and test batches are passed through unchanged.
+
+    Args:
+        crop_size (int): Output size of the random crops.
+        crop_ratio_range (tuple): Range of the crop area relative to the input, like in RandomResizedCrop.
+        aspect_ratio_range (tuple): Range of the crop aspect ratio.
+        interpolation (str): Interpolation of the crop resize.
+        flip_prob (float): Probability of a horizontal flip.
+    """
+
+    def __init__(self,
+                 crop_size=448,
+                 crop_ratio_range=(0.9, 1.0),
+                 aspect_ratio_range=(3. / 4., 4. / 3.),
+                 interpolation='bicubic',
+                 flip_prob=0.5,
+                 **kwargs):
+        super().__init__(**kwargs)
+        import kornia.augmentation as K
+
+        # 'slice' crops by indexing and resizes with interpolate, which also works on float16 batches
+        self.gpu_augments = nn.Sequential(
+            K.RandomResizedCrop((crop_size, crop_size), scale=crop_ratio_range, ratio=aspect_ratio_range,
+                                resample=interpolation, cropping_mode='slice'),
+            K.RandomHorizontalFlip(p=flip_prob),
+        )
+
+    # kornia crops every sample with its own data-dependent box, keep it out of a compiled train_step (graph breaks
+    # and a recompile per crop size), the model then only sees the fixed size batches the crop produces
+    @_compiler_disable
+    def forward(self, data, training=False):
+        data = super().forward(data, training)
+        if training:
+            data['inputs'] = self.gpu_augments(data['inputs'])
+        return data
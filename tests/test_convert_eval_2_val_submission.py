@@ -0,0 +1,28 @@
+from ensemble.utils.convert_eval_2_val_submission import construct_model_paths
+
+
+def write_report(tmp_path, lines):
+    report_path = tmp_path / 'report.txt'
+    report_path.write_text('\n'.join(lines) + '\n')
+    return str(report_path)
+
+
+def test_construct_model_paths(tmp_path):
+    report_path = write_report(tmp_path, [
+        'Timestamp: 02-09_00-32-41',
+        '| colon/1-shot/exp1\tAggregate: 0.9\tswin_bs8_exp1',
+        '| chest/10-shot/exp2\tAggregate: 0.5\tmAP: 0.4\tvit-b_exp2',
+        'endo/5-shot/swin_bs8_exp4',
+    ])
+
+    assert construct_model_paths(report_path) == [
+        ('swin_bs8_exp1', 'colon', '1-shot', 'exp1'),
+        ('vit-b_exp2', 'chest', '10-shot', 'exp2'),
+        ('endo/5-shot/swin_bs8_exp4', 'endo', '5-shot', 'swin_bs8_exp4'),
+    ]
+
+
+def test_construct_model_paths_without_task_lines(tmp_path):
+    report_path = write_report(tmp_path, ['Timestamp: 02-09_00-32-41', ''])
+
+    assert construct_model_paths(report_path) == []
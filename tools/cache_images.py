@@ -0,0 +1,80 @@
+import argparse
+import os
+
+import mmcv
+import numpy as np
+from mmengine.fileio import get
+from tqdm import tqdm
+
+"""
+Decodes all images of an annotation file once and writes them into a single uint8 blob (images.bin) with an index
+(index.npz), which is read by the CachedChest19 dataset and the LoadCachedImage transform. With --encoded the PNG
+files are packed as they are, which replaces the many small file reads by one sequential file for sets too large to
+cache decoded.
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Cache the images of an annotation file')
+    parser.add_argument('ann_file', help='annotation file, e.g. data_anns/MedFMC/chest/chest_1-shot_val_exp1.txt')
+    parser.add_argument('--data-prefix', default='data/MedFMC_train/chest/images', help='dir of the images')
+    parser.add_argument(
+        '--scale',
+        type=int,
+        help='resize the images to scale x scale like Resize(scale=...) of the test pipeline, '
+        'keep the decoded size if not given (for train pipelines with random crops)')
+    parser.add_argument('--encoded', action='store_true', help='pack the encoded image files instead of decoding them')
+    parser.add_argument('--out-dir', help='defaults to data/cache/<task>/<ann file name>[_<scale>]')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.encoded and args.scale:
+        raise ValueError('--scale needs decoded images, it can not be combined with --encoded')
+
+    out_dir = args.out_dir
+    if out_dir is None:
+        task = os.path.basename(os.path.dirname(args.ann_file))
+        name = os.path.splitext(os.path.basename(args.ann_file))[0]
+        if args.scale:
+            name = f'{name}_{args.scale}'
+        out_dir = os.path.join('data', 'cache', task, name)
+    os.makedirs(out_dir, exist_ok=True)
+    index_file = os.path.join(out_dir, 'index.npz')
+    if os.path.exists(index_file):
+        os.remove(index_file)
+
+    with open(args.ann_file) as f:
+        filenames = [x.strip().split(' ')[0] for x in f.readlines()]
+
+    offsets, lengths, shapes = [], [], []
+    offset = 0
+    with open(os.path.join(out_dir, 'images.bin'), 'wb') as blob:
+        for filename in tqdm(filenames, desc=f"Caching {args.ann_file}"):
+            content = get(os.path.join(args.data_prefix, filename))
+            if not args.encoded:
+                # Decode exactly like LoadImageFromFile, so the cached images match the ones of the pipeline
+                img = mmcv.imfrombytes(content, flag='color', backend='cv2')
+                if args.scale:
+                    img = mmcv.imresize(img, (args.scale, args.scale), interpolation='bilinear', backend='cv2')
+                shapes.append(img.shape[:2])
+                content = np.ascontiguousarray(img).tobytes()
+
+            blob.write(content)
+            offsets.append(offset)
+            lengths.append(len(content))
+            offset += len(content)
+
+    # The index is written last, an aborted run leaves no usable cache behind
+    np.savez(index_file,
+             offsets=np.array(offsets, dtype=np.int64),
+             lengths=np.array(lengths, dtype=np.int64),
+             shapes=np.array(shapes, dtype=np.int64),
+             encoded=np.array(args.encoded),
+             filenames=np.array([os.path.basename(filename) for filename in filenames]))
+    print(f"Cached {len(filenames)} images ({offset / 1024 ** 2:.0f} MB) to {out_dir}")
+
+
+if __name__ == '__main__':
+    main()
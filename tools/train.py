@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import argparse
+import multiprocessing as mp
 import os
 import os.path as osp
 import re
@@ -166,6 +167,10 @@ def merge_custom_args(cfg, args):
     if args.exp_num is not None:
         cfg.train_dataloader.dataset.ann_file = re.sub(r'exp[0-9]+', f'exp{args.exp_num}', cfg.train_dataloader.dataset.ann_file)
         cfg.val_dataloader.dataset.ann_file = re.sub(r'exp[0-9]+', f'exp{args.exp_num}', cfg.val_dataloader.dataset.ann_file)
+        # Image caches (CachedChest19) are built per annotation file, so they follow the exp as well
+        for dataloader in (cfg.train_dataloader, cfg.val_dataloader):
+            if 'cache_dir' in dataloader.dataset:
+                dataloader.dataset.cache_dir = re.sub(r'exp[0-9]+', f'exp{args.exp_num}', dataloader.dataset.cache_dir)
         cfg.work_dir = re.sub(r'exp[0-9]+', f'exp{args.exp_num}', cfg.work_dir)
 
     if args.lr is not None:
@@ -217,6 +222,13 @@ def main():
     # merge our custom cli arguments to config
     cfg = merge_custom_args(cfg, args)
 
+    # forkserver dataloader workers start from a lean server process, preload the modules every worker needs there
+    if cfg.get('env_cfg', {}).get('mp_cfg', {}).get('mp_start_method') == 'forkserver':
+        mp.set_forkserver_preload(['torch', 'numpy'] + cfg.get('custom_imports', {}).get('imports', []))
+        # The workers do not inherit the thread settings of this process, keep their OpenMP / MKL pools small
+        os.environ.setdefault('OMP_NUM_THREADS', '1')
+        os.environ.setdefault('MKL_NUM_THREADS', '1')
+
     # build the runner from config
     runner = Runner.from_cfg(cfg)
 
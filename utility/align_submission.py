@@ -1,54 +1,80 @@
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 
 """
-Aligns all .csv files in the results folder, such that the image IDs are in the correct order, corresponding to 
+Aligns all .csv files in the results folder, such that the image IDs are in the correct order, corresponding to
 chest_val.csv / colon_val.csv / endo_val.csv
 """
 
 experiments = ["exp1", "exp2", "exp3", "exp4", "exp5"]
 images_dir = "data/MedFMC_test/"
-path = os.path.join('submissions', 'evaluation')
-directories = [d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
-format = "%d-%m_%H-%M-%S"
-valid_directories = []
-for d in directories:
-    try:
-        valid_directories.append((datetime.strptime(d, format), d))
-    except Exception:
-        pass
-
-newest_directory = max(valid_directories, key=lambda x: x[0])[1]
-print(f"Aligning newest submission {newest_directory}")
-results_dir = os.path.join(path, newest_directory, "result")
-
-for exp in experiments:
-    exp_dir = os.path.join(results_dir, exp)
-
-    csv_files = [file for file in os.listdir(exp_dir) if file.endswith('.csv')]
-
-    for file in csv_files:
-        submission_csv_path = os.path.join(exp_dir, file)
-
-        # Read test_WithoutLabel.txt and remove rows without image ids
-        task = file.split("_")[0]
-        df_val_order = pd.read_csv(f"{images_dir}{task}/test_WithoutLabel.txt", header=None, names=['img_id'])
-        df_val_order.dropna(inplace=True)
-
-        # Read generated submission csv, name first column 'img_id' for easier merge
-        df_submission = pd.read_csv(submission_csv_path, header=None).rename(columns={0: 'img_id'})
-
-        # Reorder the rows of df_submission to match those of the given validation csv by merging on 'img_id'
-        result = df_val_order.merge(df_submission, on='img_id')
-        result = result[df_submission.columns]
-
-        # Check if final result is correct
-        for i in range(len(df_val_order)):
-            if result["img_id"][i] != df_val_order["img_id"][i]:
-                print("Something went wrong, aborting")
-                exit()
-        result.to_csv(submission_csv_path, header=False, index=False)
-
-print("Successfully aligned submission files to their respective {task}_val.csv")
+
+read_options = pacsv.ReadOptions(autogenerate_column_names=True, use_threads=True)
+write_options = pacsv.WriteOptions(include_header=False, quoting_style='none')
+
+
+@lru_cache(maxsize=None)
+def load_val_order(task):
+    """Read test_WithoutLabel.txt and remove rows without image ids."""
+    with open(f"{images_dir}{task}/test_WithoutLabel.txt", 'r') as f:
+        return np.array([line.strip() for line in f if line.strip()], dtype=object)
+
+
+def align_one(submission_csv_path):
+    """Aligns a single submission csv in place, returns False if the result does not match the expected order."""
+    task = os.path.basename(submission_csv_path).split("_")[0]
+    val_order = load_val_order(task)
+
+    # Read generated submission csv with arrow's threaded parser, name first column 'img_id'
+    tbl_submission = pacsv.read_csv(submission_csv_path, read_options=read_options)
+    tbl_submission = tbl_submission.rename_columns(['img_id'] + tbl_submission.column_names[1:])
+
+    # Reorder the rows of the submission to match those of the given validation csv via a position lookup
+    order = {img_id: i for i, img_id in enumerate(val_order)}
+    positions = np.array([order.get(img_id, -1) for img_id in tbl_submission.column('img_id').to_pylist()])
+    indices = np.flatnonzero(positions >= 0)
+    indices = indices[np.argsort(positions[indices], kind='stable')]
+    result = tbl_submission.take(pa.array(indices))
+
+    # Check if final result is correct
+    if result.num_rows != len(val_order) or not (result.column('img_id').to_numpy(zero_copy_only=False) == val_order).all():
+        return False
+    pacsv.write_csv(result, submission_csv_path, write_options=write_options)
+    return True
+
+
+if __name__ == "__main__":
+    path = os.path.join('submissions', 'evaluation')
+    directories = [d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
+    format = "%d-%m_%H-%M-%S"
+    valid_directories = []
+    for d in directories:
+        try:
+            valid_directories.append((datetime.strptime(d, format), d))
+        except Exception:
+            pass
+
+    newest_directory = max(valid_directories, key=lambda x: x[0])[1]
+    print(f"Aligning newest submission {newest_directory}")
+    results_dir = os.path.join(path, newest_directory, "result")
+
+    csv_files = []
+    for exp in experiments:
+        exp_dir = os.path.join(results_dir, exp)
+        csv_files += [os.path.join(exp_dir, file) for file in os.listdir(exp_dir) if file.endswith('.csv')]
+
+    # Every file is independent, align them in parallel
+    with ProcessPoolExecutor() as executor:
+        aligned = list(executor.map(align_one, csv_files))
+
+    if not all(aligned):
+        print("Something went wrong, aborting")
+        exit()
+
+    print("Successfully aligned submission files to their respective {task}_val.csv")
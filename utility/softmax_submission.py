@@ -24,18 +24,34 @@ def process_csv(filename):
             writer.writerow(row)
 
 
+def find_all_csv_files_in_directory(root):
+    """Recursively collect all .csv files below root using the cached scandir entry types."""
+    stack = [root]
+    csv_files = []
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.csv'):
+                        csv_files.append(entry.path)
+        except OSError:
+            continue
+    return csv_files
+
+
 def main(start_path):
     experiments = [f'exp{i}' for i in range(1, 6)]
 
     for exp in experiments:
         exp_path = os.path.join(start_path, exp)
 
-        for root, dirs, files in os.walk(exp_path):
-            for file in files:
-                if file.endswith('.csv') and "colon" in file:
-                    filepath = os.path.join(root, file)
-                    process_csv(filepath)
-                    print(f"Processed {filepath}")
+        for filepath in find_all_csv_files_in_directory(exp_path):
+            if "colon" in os.path.basename(filepath):
+                process_csv(filepath)
+                print(f"Processed {filepath}")
 
 
 base_path = "submissions/evaluation/"